@@ -1,10 +1,10 @@
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QLabel, QVBoxLayout,
     QFileDialog, QComboBox
 )
-from PIL import Image
 
 class AspectResizer(QWidget):
     def __init__(self):
@@ -61,28 +61,39 @@ class AspectResizer(QWidget):
             self.output_label.setText("⚠️ 出力フォルダが選択されていません")
             return
 
-    target_ratio = self.aspect_box.currentText()
-    w_ratio, h_ratio = map(int, target_ratio.split(":"))
-    ratio = w_ratio / h_ratio
-
-    for fname in os.listdir(self.folder_path):
-        if fname.lower().endswith(('.png', '.jpg', '.jpeg')):
-            path = os.path.join(self.folder_path, fname)
-            img = Image.open(path)
-            img = self.resize_and_crop(img, ratio)
-
-            # 出力ファイルパスの生成（重複チェック付き）
-            output_path = os.path.join(self.output_folder, fname)
-            base, ext = os.path.splitext(output_path)
-            counter = 1
-            while os.path.exists(output_path):
-                output_path = f"{base}_{counter}{ext}"
-                counter += 1
-
-            img.save(output_path)
-
-    self.folder_label.setText("✅ 処理完了！")
-
+        target_ratio = self.aspect_box.currentText()
+        w_ratio, h_ratio = map(int, target_ratio.split(":"))
+        ratio = w_ratio / h_ratio
+
+        # 出力ファイルパスの生成（重複チェック付き）は先に順番に決めておく
+        jobs = []
+        reserved = set()
+        for fname in os.listdir(self.folder_path):
+            if fname.lower().endswith(('.png', '.jpg', '.jpeg')):
+                path = os.path.join(self.folder_path, fname)
+                output_path = os.path.join(self.output_folder, fname)
+                base, ext = os.path.splitext(output_path)
+                counter = 1
+                while os.path.exists(output_path) or output_path in reserved:
+                    output_path = f"{base}_{counter}{ext}"
+                    counter += 1
+                reserved.add(output_path)
+                jobs.append((path, output_path))
+
+        # 読み込み・クロップ・保存は画像ごとに独立なのでスレッドで並べる
+        # （PIL のデコード/エンコードは GIL を離すので複数枚が重なって進む）
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as ex:
+            list(ex.map(lambda job: self.convert_one(job[0], job[1], ratio), jobs))
+
+        self.folder_label.setText("✅ 処理完了！")
+
+    def convert_one(self, path, output_path, ratio):
+        # PIL は読み込みが重いので、ウィンドウ表示を待たせないよう実際に変換するときに import する
+        from PIL import Image
+
+        # with で開いてファイルハンドルを確実に閉じる（スレッドで並べても開きっぱなしが溜まらない）
+        with Image.open(path) as src:
+            self.resize_and_crop(src, ratio).save(output_path)
 
     def resize_and_crop(self, img, target_ratio):
         w, h = img.size
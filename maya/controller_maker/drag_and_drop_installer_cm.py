@@ -18,12 +18,20 @@
 
 from __future__ import annotations
 import os
+import importlib
 import sys, re
 import shutil
 from maya import cmds, mel
 
 # 定数
 DEFAULT_SHELF_TAB_NAME = "PyTools"
+# パス区切りをスラッシュへ統一する変換テーブル
+_SLASH = str.maketrans("\\", "/")
+# MEL 文字列リテラル用: パス区切りのスラッシュ化と `"` のエスケープを1パスで行う変換テーブル
+_MEL_TRANS = str.maketrans({"\\": "/", '"': '\\"'})
+
+# シェルフ名として不適切な文字を `_` へ置換する変換テーブル
+_SHELF_CLEAN = dict.fromkeys(map(ord, '\\/:*?"<>| '), ord('_'))
 
 # エントリーポイント
 def onMayaDroppedPythonFile(*_):
@@ -77,27 +85,33 @@ def install_tool() -> None:
     dst_scripts = dst_root
     dst_icon = os.path.join(dst_root, "icon")
 
-    _copy_subdir(src_scripts, dst_scripts)
-    _copy_subdir(src_icons, dst_icon)
+    # スクリプトは dst_root 直下に置くため、同居する icon と __pycache__ は同期の削除対象から外す
+    _sync_subdir(src_scripts, dst_scripts, exclude=frozenset({"icon", "__pycache__"}))
+    _sync_subdir(src_icons, dst_icon)
 
     # .mod は使わず、起動時にランタイムへパスを注入する方式に変更。
-    scripts_path = dst_scripts.replace("\\", "/")
-    icons_path = dst_icon.replace("\\", "/")
+    scripts_path = dst_scripts.translate(_SLASH)
+    icons_path = dst_icon.translate(_SLASH)
 
     shelf_name = _sanitize_shelf_name(shelf_tab_name)
-    mel_path = src_mel.replace("\\", "/")
+    mel_path = src_mel.translate(_SLASH)
     mel.eval(f'source "{mel_path}";')
 
     # 再起動前でもユーザーが押して様子を見られるよう、試行して失敗時は警告。
+    # 起動のたびにはリロードしない（run() が開いているウィンドウを作り直さずに再利用できるように）。
     py_cmd = (
-        "import sys, importlib; "
+        "import sys; "
         f"p=r'{scripts_path}'; "
         "sys.path.append(p) if p not in sys.path else None; "
         f"from {tool_name} import main as {tool_name}_main; "
-        f"importlib.reload({tool_name}_main); "
         f"{tool_name}_main.run()"
     )
 
+    # 代わりに、このセッションで読み込み済みなら再インストール時に一度だけリロードして新しいコードを反映する
+    loaded = sys.modules.get(f"{tool_name}.main")
+    if loaded is not None:
+        importlib.reload(loaded)
+
     _remove_existing_shelf_button(shelf_name, tool_name_with_virsion)
     _call_add_to_shelf(shelf_name, tool_name_with_virsion, py_cmd, _find_icon(dst_icon))
 
@@ -123,13 +137,13 @@ def _get_version_from_init(dir_path: str) -> str | None:
         version の文字列。見つからなければ None。
     """
     init_path = os.path.join(dir_path, "__init__.py")
-    if not os.path.isfile(init_path):
+    try:
+        with open(init_path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
         return None
 
-    with open(init_path, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    match = re.search(r'version\s*=\s*[\'"]([^\'"]+)[\'"]', text)
+    match = re.search(r'^\s*version\s*=\s*[\'"]([^\'"]+)[\'"]', text, re.M)
     return match.group(1) if match else None
 
 
@@ -150,6 +164,65 @@ def _copy_subdir(src: str, dst: str) -> None:
     shutil.copytree(src, dst)
 
 
+def _sync_subdir(src: str, dst: str, exclude: frozenset[str] = frozenset()) -> None:
+    """サブディレクトリを差分同期する。
+
+    `dst` が存在しない場合は `_copy_subdir` で丸ごとコピーします。
+    存在する場合はサイズと更新時刻が異なるファイルだけを上書きし、
+    コピー元に無いファイル・ディレクトリを削除します（再インストール時の無駄な I/O を省く）。
+    `exclude` に含まれる名前のエントリは削除対象から外し、中も走査しません。
+
+    Args:
+        src: コピー元ディレクトリの絶対パス
+        dst: コピー先ディレクトリの絶対パス
+        exclude: 削除しないファイル・ディレクトリ名（`dst` 直下に同居する `icon` など）
+    """
+    if not os.path.isdir(src):
+        return
+    if not os.path.isdir(dst):
+        _copy_subdir(src, dst)
+        return
+
+    expected = set()
+    for root, _dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        dst_dir = dst if rel == os.curdir else os.path.join(dst, rel)
+        os.makedirs(dst_dir, exist_ok=True)
+        expected.add(os.path.normcase(dst_dir))
+        for name in files:
+            src_path = os.path.join(root, name)
+            dst_path = os.path.join(dst_dir, name)
+            expected.add(os.path.normcase(dst_path))
+            src_st = os.stat(src_path)
+            try:
+                dst_st = os.stat(dst_path)
+            except OSError:
+                dst_st = None
+            if dst_st is None or (dst_st.st_mtime_ns, dst_st.st_size) != (src_st.st_mtime_ns, src_st.st_size):
+                # 既存ファイルは先に削除してから新しく書く（ハードリンクで配置された旧インストールの
+                # コピー元へ上書きが波及しないように）
+                if dst_st is not None:
+                    os.unlink(dst_path)
+                shutil.copy2(src_path, dst_path)
+
+    # コピー元に無いものを削除（除外名のディレクトリには降りない）
+    for root, dirs, files in os.walk(dst):
+        for name in files:
+            path = os.path.join(root, name)
+            if name not in exclude and os.path.normcase(path) not in expected:
+                os.remove(path)
+        keep = []
+        for name in dirs:
+            if name in exclude:
+                continue
+            path = os.path.join(root, name)
+            if os.path.normcase(path) in expected:
+                keep.append(name)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+        dirs[:] = keep
+
+
 def _find_icon(icon_dir: str) -> str:
     """アイコンディレクトリから最初に見つかった PNG を返す。
 
@@ -161,12 +234,19 @@ def _find_icon(icon_dir: str) -> str:
     Returns:
         使用するアイコンファイルのパス（スラッシュ区切り）
     """
-    if not os.path.isdir(icon_dir):
+    try:
+        it = os.scandir(icon_dir)
+    except OSError:
         return "pythonFamily.png"
-    for f in os.listdir(icon_dir):
-        if f.lower().endswith(".png"):
-            return os.path.join(icon_dir, f).replace("\\", "/")
-    return "pythonFamily.png"
+    with it:
+        return next(
+            (
+                e.path.translate(_SLASH)
+                for e in it
+                if e.name.lower().endswith(".png") and e.is_file()
+            ),
+            "pythonFamily.png",
+        )
 
 
 def _mel_escape(s: str) -> str:
@@ -178,7 +258,7 @@ def _mel_escape(s: str) -> str:
     Returns:
         エスケープ後の文字列
     """
-    return s.replace("\\", "/").replace('"', '\\"')
+    return s.translate(_MEL_TRANS)
 
 
 def _call_add_to_shelf(shelf_name: str, label: str, py_cmd: str, icon: str) -> None:
@@ -190,11 +270,8 @@ def _call_add_to_shelf(shelf_name: str, label: str, py_cmd: str, icon: str) -> N
         py_cmd: ボタン押下時に実行する Python コマンド
         icon: ボタンアイコンのパス（またはファイル名）
     """
-    a = _mel_escape(shelf_name)
-    b = _mel_escape(label)
-    c = _mel_escape(py_cmd)
-    d = _mel_escape(icon)
-    mel.eval(f'add_to_shelf("{a}", "{b}", "{c}", "{d}");')
+    args = ", ".join(f'"{v}"' for v in map(_mel_escape, (shelf_name, label, py_cmd, icon)))
+    mel.eval(f"add_to_shelf({args});")
 
 
 def _inview(msg: str) -> None:
@@ -219,9 +296,7 @@ def _sanitize_shelf_name(name: str) -> str:
     Returns:
         置換後のシェルフ名
     """
-    invalid_chars = r'\\/:*?"<>| '
-    sanitized = ''.join(c if c not in invalid_chars else '_' for c in name)
-    return sanitized
+    return name.translate(_SHELF_CLEAN)
 
 
 def _remove_existing_shelf_button(shelf_name: str, label: str) -> None:
@@ -234,16 +309,30 @@ def _remove_existing_shelf_button(shelf_name: str, label: str) -> None:
     if not cmds.shelfLayout(shelf_name, exists=True):
         return
     children = cmds.shelfLayout(shelf_name, query=True, childArray=True) or []
+    labels = {}
     for child in children:
         try:
             if cmds.objectTypeUI(child) == 'shelfButton':
-                lbl = cmds.shelfButton(child, q=True, label=True)
-                if lbl == label:
-                    try:
-                        cmds.deleteUI(child)
-                        print(f"[Installer] Removed existing shelf button '{label}' from shelf '{shelf_name}'.")
-                    except Exception:
-                        pass
+                labels[child] = cmds.shelfButton(child, q=True, label=True)
         except Exception:
             # 不明なUI型やクエリ失敗は無視
-            pass
\ No newline at end of file
+            pass
+
+    dead = [c for c, lbl in labels.items() if lbl == label]
+    if not dead:
+        return
+    try:
+        # deleteUI は複数指定を受け付けるので一度にまとめて削除
+        cmds.deleteUI(dead)
+        print(f"[Installer] Removed existing shelf button '{label}' from shelf '{shelf_name}'.")
+        return
+    except Exception:
+        pass
+
+    # まとめて削除できなかった場合は1つずつ削除し、消せたものだけでも重複を減らす
+    for child in dead:
+        try:
+            cmds.deleteUI(child)
+            print(f"[Installer] Removed existing shelf button '{label}' from shelf '{shelf_name}'.")
+        except Exception as e:
+            cmds.warning(f"[Installer] Failed to remove shelf button '{child}': {e}")
\ No newline at end of file
@@ -17,9 +17,11 @@ UIで選択したオブジェクトをリスト表示し、各ターゲットに
 
 from __future__ import annotations
 
+import contextlib
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Sequence, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
+import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
 # =========================
@@ -65,6 +67,41 @@ WINDOW_NAME = "soso_ctrl_maker"
 UI_TITLE = "Controller Maker"
 SHAPE_DEFS: Dict[str, ShapeDef] = _shape_defs()
 
+# 円の法線軸 → cmds.circle の nr
+_NORMAL_VECTORS: Dict[str, Tuple[int, int, int]] = {
+    "X": (1, 0, 0),
+    "Y": (0, 1, 0),
+    "Z": (0, 0, 1),
+}
+
+
+def _shape_builders() -> Dict[Tuple[str, str], Callable[[str], str]]:
+    """(形状キー, 法線軸) ごとに、名前だけを受け取る作成関数を組み立てる。
+
+    SHAPE_DEFS は読み込み時に確定しているので、形状の分岐・法線の解決・
+    points/knots のリスト化をここで一度だけ済ませます(リストは全コントローラーで共有)。
+
+    Returns:
+        (形状キー, 法線軸) をキーとした作成関数の辞書。
+    """
+    builders: Dict[Tuple[str, str], Callable[[str], str]] = {}
+    for key, shape_def in SHAPE_DEFS.items():
+        for axis, nr in _NORMAL_VECTORS.items():
+            if shape_def == "circle":
+                builders[(key, axis)] = (
+                    lambda name, nr=nr: cmds.circle(n=name, ch=False, o=True, nr=nr, r=1.0)[0]
+                )
+            elif isinstance(shape_def, CurveShapeDef):
+                # カーブ形状は法線軸に依存しない
+                builders[(key, axis)] = (
+                    lambda name, d=shape_def.degree, p=list(shape_def.points), k=list(shape_def.knots):
+                    cmds.curve(n=name, d=d, p=p, k=k)
+                )
+    return builders
+
+
+_SHAPE_BUILDERS: Dict[Tuple[str, str], Callable[[str], str]] = _shape_builders()
+
 
 def _safe_name_from_target(target: str) -> str:
     """ターゲット名から安全な名前を生成する。
@@ -77,11 +114,10 @@ def _safe_name_from_target(target: str) -> str:
     Returns:
         安全な名前文字列。
     """
-    base = target.split("|")[-1]
-    return base.replace(":", "_")
+    return target.rpartition("|")[2].replace(":", "_")
 
 
-def _unique_name(base: str) -> str:
+def _unique_name(base: str, taken: Optional[Set[str]] = None) -> str:
     """ユニークな名前を生成する。
 
     指定された名前が存在しない場合はそのまま返し、存在する場合は
@@ -89,16 +125,25 @@ def _unique_name(base: str) -> str:
 
     Args:
         base: ベースとなる名前。
+        taken: バッチ内で払い出し済みの名前集合。指定時は先にこの集合で判定し
+            (シーン問い合わせを省く)、決定した名前を追加します。
 
     Returns:
         ユニークな名前文字列。
     """
-    if not cmds.objExists(base):
-        return base
+    if taken is None:
+        taken = set()
+
+    def _exists(name: str) -> bool:
+        return name in taken or cmds.objExists(name)
+
+    name = base
     i = 1
-    while cmds.objExists(f"{base}{i}"):
+    while _exists(name):
+        name = f"{base}{i}"
         i += 1
-    return f"{base}{i}"
+    taken.add(name)
+    return name
 
 
 def _create_shape_transform(shape_key: str, name: str, normal_axis: str) -> str:
@@ -118,108 +163,70 @@ def _create_shape_transform(shape_key: str, name: str, normal_axis: str) -> str:
     Raises:
         RuntimeError: 未知の形状キーまたは作成に失敗した場合。
     """
-    shape_def = SHAPE_DEFS.get(shape_key)
-    if shape_def is None:
+    if shape_key not in SHAPE_DEFS:
         raise RuntimeError(f"Unknown shape_key: {shape_key}")
 
-    ctrl = ""
-    if shape_def == "circle":
-        # 円の法線軸を選択可能 (X/Y/Z)
-        axis = (normal_axis or "Y").upper()
-        if axis == "X":
-            nr = (1, 0, 0)
-        elif axis == "Z":
-            nr = (0, 0, 1)
-        else:
-            nr = (0, 1, 0)
-
-        ctrl = cmds.circle(n=name, ch=False, o=True, nr=nr, r=1.0)[0]
-
-    elif isinstance(shape_def, CurveShapeDef):
-        ctrl = cmds.curve(n=name, d=shape_def.degree, p=list(shape_def.points), k=list(shape_def.knots))
+    # 円の法線軸を選択可能 (X/Y/Z)。未知の値は Y として扱う
+    axis = (normal_axis or "Y").upper()
+    if axis not in _NORMAL_VECTORS:
+        axis = "Y"
+    builder = _SHAPE_BUILDERS.get((shape_key, axis))
+    ctrl = builder(name) if builder else ""
 
     if not ctrl:
         raise RuntimeError(f"Failed to create shape for {shape_key}")
 
-    # 原点でクリーンなTRSを保持
-    cmds.xform(ctrl, ws=True, t=(0.0, 0.0, 0.0), ro=(0.0, 0.0, 0.0))
+    # cmds.circle / cmds.curve は原点・無回転で作成するので、TRSのリセットは不要
     return ctrl
 
 
-def _get_world_matrix(target: str) -> List[float]:
-    """ターゲットのワールドマトリックスを取得する。
+def _dag_path(node: str) -> om2.MDagPath:
+    """ノード名からMDagPathを取得する。
 
     Args:
-        target: Mayaオブジェクトの名前。
+        node: Mayaオブジェクトの名前。
 
     Returns:
-        16要素のワールドマトリックスリスト。
+        ノードのMDagPath。
     """
-    return [float(v) for v in cmds.xform(target, q=True, ws=True, m=True)]
+    sel = om2.MSelectionList()
+    sel.add(node)
+    return sel.getDagPath(0)
 
 
-def _get_world_position(target: str) -> Tuple[float, float, float]:
-    """ターゲットの堅牢なワールド位置を取得する。
+def _get_world_matrix(target: str) -> List[float]:
+    """ターゲットのワールドマトリックスを取得する。
+
+    コマンドエンジンを経由せず、API 2.0のinclusiveMatrixを読み取ります。
 
     Args:
         target: Mayaオブジェクトの名前。
 
     Returns:
-        (x, y, z)のワールド座標タプル。
+        16要素のワールドマトリックスリスト。
     """
-    t = cmds.xform(target, q=True, ws=True, t=True)
-    return (float(t[0]), float(t[1]), float(t[2]))
+    return list(_dag_path(target).inclusiveMatrix())
 
 
-def _matrix_remove_scale_shear(m: List[float]) -> List[float]:
-    """マトリックスからスケールとシアーを除去する。
+def _get_snap_matrix(target: str) -> List[float]:
+    """ターゲットへスナップするためのワールドマトリックスを取得する。
 
-    正規直交化された回転軸を持つマトリックスを返します。
-    移動成分は保持されます。
+    parentConstraint(mo=False)と同じ配置になるよう、回転はワールドマトリックスを
+    分解した回転成分のみ(負スケール・シアーは分解側に残す)を使い、
+    位置はターゲットの回転ピボットのワールド座標とします。
 
     Args:
-        m: 16要素の4x4マトリックスリスト(行優先)。
+        target: Mayaオブジェクトの名前。
 
     Returns:
-        正規化された回転軸と元の移動成分を持つマトリックス。
+        スケール・シアーを含まない16要素のワールドマトリックスリスト。
     """
-    # 行優先の軸
-    x = [m[0], m[1], m[2]]
-    y = [m[4], m[5], m[6]]
-    z = [m[8], m[9], m[10]]
-
-    def _norm(v: List[float]) -> List[float]:
-        import math
-        l = math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
-        if l < 1e-8:
-            return [0.0, 0.0, 0.0]
-        return [v[0] / l, v[1] / l, v[2] / l]
-
-    xn = _norm(x)
-    yn = _norm(y)
-    zn = _norm(z)
-
-    out = list(m)
-    out[0], out[1], out[2] = xn
-    out[4], out[5], out[6] = yn
-    out[8], out[9], out[10] = zn
-
-    # 移動成分を保持
-    out[12], out[13], out[14] = m[12], m[13], m[14]
-    out[3] = out[7] = out[11] = 0.0
-    out[15] = 1.0
-    return out
-
-
-def _freeze_trs(node: str) -> None:
-    """トランスフォーム属性をフリーズする。
-
-    移動・回転・スケールをすべてフリーズします。
-
-    Args:
-        node: フリーズするノードの名前。
-    """
-    cmds.makeIdentity(node, apply=True, t=True, r=True, s=True, n=False)
+    dag = _dag_path(target)
+    rot = om2.MTransformationMatrix(dag.inclusiveMatrix()).rotation(asQuaternion=True)
+    m = list(rot.asMatrix())
+    rp = om2.MFnTransform(dag).rotatePivot(om2.MSpace.kWorld)
+    m[12], m[13], m[14] = rp.x, rp.y, rp.z
+    return m
 
 
 def _freeze_rot(node: str) -> None:
@@ -247,6 +254,9 @@ def _rename_shape_as_transform_shape(ctrl: str) -> None:
 
     if len(shapes) == 1:
         new_shape = f"{ctrl}Shape"
+        # cmds.circle / cmds.curve は通常 {ctrl}Shape で作成するので、その場合は何もしない
+        if shapes[0] == new_shape:
+            return
         if cmds.objExists(new_shape):
             new_shape = _unique_name(new_shape)
         cmds.rename(shapes[0], new_shape)
@@ -254,12 +264,17 @@ def _rename_shape_as_transform_shape(ctrl: str) -> None:
 
     for i, shp in enumerate(shapes, start=1):
         new_shape = f"{ctrl}Shape{i}"
+        if shp == new_shape:
+            continue
         if cmds.objExists(new_shape):
             new_shape = _unique_name(new_shape)
         cmds.rename(shp, new_shape)
 
 
-def _find_joint_root_name(target: str) -> str:
+def _find_joint_root_name(
+        target: str,
+        root_cache: Optional[Dict[str, str]] = None,
+) -> str:
     """ターゲットのジョイント階層のルート名を検索する。
 
     ターゲットから親をたどり、最上位のジョイントノード名を返します。
@@ -267,52 +282,39 @@ def _find_joint_root_name(target: str) -> str:
 
     Args:
         target: 検索開始するターゲットノードの名前。
+        root_cache: バッチ内の ターゲット→結果 キャッシュ。
 
     Returns:
         ジョイントルートまたは階層ルートの安全な名前。
     """
-    if not cmds.objExists(target):
-        return _safe_name_from_target(target)
+    if root_cache is not None and target in root_cache:
+        return root_cache[target]
 
-    def is_joint(n: str) -> bool:
-        try:
-            return cmds.nodeType(n) == "joint"
-        except Exception:
-            return False
-
-    start_joint: Optional[str] = None
-    if is_joint(target):
-        start_joint = target
+    long_names = cmds.ls(target, l=True) or []
+    if not long_names:
+        root = _safe_name_from_target(target)
     else:
-        parents = cmds.listRelatives(target, p=True, f=True) or []
-        cur = parents[0] if parents else None
-        while cur:
-            if is_joint(cur):
-                start_joint = cur
-                break
-            p = cmds.listRelatives(cur, p=True, f=True) or []
-            cur = p[0] if p else None
-
-    if start_joint:
-        cur = start_joint
-        while True:
-            p = cmds.listRelatives(cur, p=True, f=True) or []
-            if not p:
-                break
-            if is_joint(p[0]):
-                cur = p[0]
-            else:
-                break
-        return _safe_name_from_target(cur)
-
-    long_name = cmds.ls(target, l=True) or [target]
-    dag = long_name[0]
-    if "|" in dag:
-        parts = [p for p in dag.split("|") if p]
-        if parts:
-            return _safe_name_from_target(parts[0])
-
-    return _safe_name_from_target(target)
+        # 祖先パスのジョイントを1回のlsでまとめて判定し、親はパスの1つ手前として辿る
+        # (ノードごとのnodeType / listRelatives 呼び出しを避ける)
+        parts = [p for p in long_names[0].split("|") if p]
+        ancestry = ["|" + "|".join(parts[:i + 1]) for i in range(len(parts))]
+        joints = set(cmds.ls(ancestry, type="joint", long=True) or [])
+
+        # 自身を含めて最も近いジョイント祖先
+        idx = next((i for i in range(len(ancestry) - 1, -1, -1) if ancestry[i] in joints), None)
+        if idx is not None:
+            # 親がジョイントである限り上へ
+            while idx > 0 and ancestry[idx - 1] in joints:
+                idx -= 1
+            root = _safe_name_from_target(ancestry[idx])
+        elif parts:
+            root = _safe_name_from_target(parts[0])
+        else:
+            root = _safe_name_from_target(target)
+
+    if root_cache is not None:
+        root_cache[target] = root
+    return root
 
 
 def _parent_preserve_world(child: str, new_parent: str) -> None:
@@ -325,7 +327,8 @@ def _parent_preserve_world(child: str, new_parent: str) -> None:
         child: 子ノードの名前。
         new_parent: 新しい親ノードの名前。
     """
-    child_m = cmds.xform(child, q=True, ws=True, m=True)
+    # 読み取りは API 2.0 で行う(書き込みは undo に載せるため cmds のまま)
+    child_m = _get_world_matrix(child)
     cmds.parent(child, new_parent)
     cmds.xform(child, ws=True, m=child_m)
 
@@ -337,6 +340,8 @@ def _make_offset_group(
         desired_root_grp_name: str,
         desired_offset_grp_name: str,
         orientation_mode: str,
+        target_matrix: Optional[List[float]] = None,
+        existing_roots: Optional[Set[str]] = None,
 ) -> str:
     """コントローラーグループを作成する。
 
@@ -355,16 +360,26 @@ def _make_offset_group(
         desired_root_grp_name: ルートグループの希望名。
         desired_offset_grp_name: オフセットグループの希望名。
         orientation_mode: "match"または"world"。
+        target_matrix: 事前取得したスナップ用マトリックス(`_get_snap_matrix`)。
+            省略時はここで取得します。
+        existing_roots: バッチ内で存在が分かっているルートグループ名の集合。
+            指定時は objExists の代わりにこの集合で判定し、新規作成したルートを追加します。
 
     Returns:
         作成されたオフセットグループの名前。
     """
     # ルートコンテナ(再利用)
-    if cmds.objExists(desired_root_grp_name):
+    if existing_roots is not None:
+        root_exists = desired_root_grp_name in existing_roots
+    else:
+        root_exists = cmds.objExists(desired_root_grp_name)
+    if root_exists:
         root_grp = desired_root_grp_name
     else:
         root_grp = cmds.group(em=True, n=desired_root_grp_name)
         cmds.xform(root_grp, ws=True, t=(0.0, 0.0, 0.0), ro=(0.0, 0.0, 0.0))
+        if existing_roots is not None:
+            existing_roots.add(root_grp)
 
     # ターゲットごとのオフセットグループ(ユニーク) — 最初は親なしで作成
     offset_grp = desired_offset_grp_name
@@ -374,12 +389,11 @@ def _make_offset_group(
 
     # 1) オフセットグループをワールド空間でスナップ(親子付け前)
     # モード間で配置が崩れないように常にスナップします。
-    tmp = cmds.parentConstraint(target, offset_grp, mo=False)[0]
-    cmds.delete(tmp)
-
-    # 2) ピボットを現在位置に強制
-    pos_now = _get_world_position(offset_grp)
-    cmds.xform(offset_grp, ws=True, rp=pos_now, sp=pos_now)
+    # (一時コンストレイントは使わず、スケール/シアーを除いたマトリックスを直接設定する)
+    if target_matrix is None:
+        target_matrix = _get_snap_matrix(target)
+    # 新規グループのピボットはローカル原点 = スナップ後の位置なので、ピボット設定は不要
+    cmds.xform(offset_grp, ws=True, m=target_matrix)
 
     # 3) CTRLをオフセットグループ下に親子付け(ワールド位置は保持しない)
     cmds.parent(ctrl, offset_grp, relative=True)
@@ -389,9 +403,9 @@ def _make_offset_group(
     if (orientation_mode or "match").lower() == "world":
         # CTRLのワールド回転を0に設定 -> Mayaが親の回転をキャンセルするローカル値を計算
         cmds.xform(ctrl, ws=True, ro=(0.0, 0.0, 0.0))
+        # 回転フリーズで ro は 0 に戻り、t=0 / s=1 は relative 親子付けのまま変わらないので
+        # CTRLはこの時点でクリーン(追加のリセットは不要)
         _freeze_rot(ctrl)
-        # CTRLをクリーンに保持
-        cmds.xform(ctrl, os=True, t=(0.0, 0.0, 0.0), ro=(0.0, 0.0, 0.0), s=(1.0, 1.0, 1.0))
 
     # 4) オフセットグループをルートコンテナ下に親子付け、ワールドを保持
     _parent_preserve_world(offset_grp, root_grp)
@@ -425,71 +439,107 @@ def _constrain_target_to_ctrl(
     return created
 
 
-def create_controller_for_target(
+@dataclass(frozen=True)
+class _ControllerPlan:
+    """1ターゲット分のコントローラー作成計画。
+
+    シーンを変更しない準備段階の結果で、適用段階でそのまま使用します。
+
+    Attributes:
+        target: ターゲットノード(ロングネーム)。
+        ctrl_name: コントローラーの希望名。
+        root_grp_name: ルートコンテナの希望名。
+        offset_grp_name: オフセットグループの希望名。
+        snap_matrix: 事前取得したスナップ用ワールドマトリックス。
+    """
+    target: str
+    ctrl_name: str
+    root_grp_name: str
+    offset_grp_name: str
+    snap_matrix: Tuple[float, ...]
+
+
+def _plan_controller(
         target: str,
-        shape_key: str,
         input_name: str,
+        root_cache: Optional[Dict[str, str]] = None,
+) -> _ControllerPlan:
+    """ターゲットのコントローラー作成計画を立てる(シーンは変更しない)。
+
+    Args:
+        target: コントローラーを作成するターゲットノード(ロングネーム)。
+        input_name: 命名に使用する入力名。
+        root_cache: `_find_joint_root_name` に渡すバッチ内キャッシュ。
+
+    Returns:
+        作成計画。
+    """
+    base = _safe_name_from_target(target)
+    input_name = input_name.strip() or "CTL"
+    root_name = _find_joint_root_name(target, root_cache)
+    return _ControllerPlan(
+        target=target,
+        ctrl_name=f"{base}_{input_name}_CTL",
+        root_grp_name=f"{root_name}_{input_name}_GRP",
+        offset_grp_name=f"{base}_{input_name}_CTL_GRP",
+        snap_matrix=tuple(_get_snap_matrix(target)),
+    )
+
+
+def _apply_controller_plan(
+        plan: _ControllerPlan,
+        shape_key: str,
         match_orientation: bool,
         maintain_offset: bool,
         use_scale_constraint: bool,
         normal_axis: str,
         orientation_mode: str,
+        taken_names: Optional[Set[str]] = None,
+        existing_roots: Optional[Set[str]] = None,
 ) -> Tuple[str, str, List[str]]:
-    """ターゲットに対してコントローラーを作成する。
+    """作成計画に従ってコントローラーを作成する。
 
-    以下の手順でコントローラーを作成します:
-    1. 原点でコントローラー形状を作成(クリーン)
-    2. 原点でフリーズ(安全)
-    3. ルートコンテナ下にターゲットごとのオフセットグループを作成
-    4. ターゲットをコントローラーにコンストレイント
+    ユニーク名の決定はシーン状態に依存するため、適用時に行います。
 
     Args:
-        target: コントローラーを作成するターゲットノード。
+        plan: `_plan_controller` で作成した計画。
         shape_key: 形状の種類。
-        input_name: 命名に使用する入力名。
         match_orientation: 方向をターゲットに一致させるか。
         maintain_offset: コンストレイントでオフセットを維持するか。
         use_scale_constraint: scaleConstraintを使用するか。
         normal_axis: 円の法線軸("X", "Y", "Z")。
         orientation_mode: "match"または"world"。
+        taken_names: バッチ内で払い出し済みの名前集合(`_unique_name` 参照)。
+        existing_roots: 存在するルートグループ名の集合(`_make_offset_group` 参照)。
 
     Returns:
         (コントローラー名, グループ名, コンストレイントリスト)のタプル。
-
-    Raises:
-        RuntimeError: ターゲットが存在しない場合。
     """
-    if not cmds.objExists(target):
-        raise RuntimeError(f"Target does not exist: {target}")
-
-    base = _safe_name_from_target(target)
-    input_name = input_name.strip() or "CTL"
+    target = plan.target
 
     # 命名
-    desired_ctrl_name = _unique_name(f"{base}_{input_name}_CTL")
-    root_name = _find_joint_root_name(target)
-    desired_root_grp_name = f"{root_name}_{input_name}_GRP"
-    desired_offset_grp_name = _unique_name(f"{base}_{input_name}_CTL_GRP")
+    desired_ctrl_name = _unique_name(plan.ctrl_name, taken_names)
+    desired_offset_grp_name = _unique_name(plan.offset_grp_name, taken_names)
 
     # 1) 原点でコントローラーを作成(クリーン)
+    # 生成直後のTRSは単位(原点・無回転・等倍)なので、ここでのフリーズは不要
     ctrl = _create_shape_transform(shape_key, desired_ctrl_name, normal_axis=normal_axis)
 
-    # 2) 原点でフリーズ(安全)
-    _freeze_trs(ctrl)
-
-    # 3) ルートコンテナ下にターゲットごとのオフセットグループを作成
+    # 2) ルートコンテナ下にターゲットごとのオフセットグループを作成
     grp = _make_offset_group(
         ctrl=ctrl,
         target=target,
         match_orientation=match_orientation,
-        desired_root_grp_name=desired_root_grp_name,
+        desired_root_grp_name=plan.root_grp_name,
         desired_offset_grp_name=desired_offset_grp_name,
         orientation_mode=orientation_mode,
+        target_matrix=list(plan.snap_matrix),
+        existing_roots=existing_roots,
     )
 
     _rename_shape_as_transform_shape(ctrl)
 
-    # 4) ターゲットをコントローラーにコンストレイント
+    # 3) ターゲットをコントローラーにコンストレイント
     constraints = _constrain_target_to_ctrl(
         target=target,
         ctrl=ctrl,
@@ -500,14 +550,81 @@ def create_controller_for_target(
     return ctrl, grp, constraints
 
 
+def create_controller_for_target(
+        target: str,
+        shape_key: str,
+        input_name: str,
+        match_orientation: bool,
+        maintain_offset: bool,
+        use_scale_constraint: bool,
+        normal_axis: str,
+        orientation_mode: str,
+) -> Tuple[str, str, List[str]]:
+    """ターゲットに対してコントローラーを作成する。
+
+    以下の手順でコントローラーを作成します:
+    1. 原点でコントローラー形状を作成(クリーン、生成直後はTRSが単位なのでフリーズ不要)
+    2. ルートコンテナ下にターゲットごとのオフセットグループを作成
+    3. ターゲットをコントローラーにコンストレイント
+
+    Args:
+        target: コントローラーを作成するターゲットノード(ロングネーム)。
+        shape_key: 形状の種類。
+        input_name: 命名に使用する入力名。
+        match_orientation: 方向をターゲットに一致させるか。
+        maintain_offset: コンストレイントでオフセットを維持するか。
+        use_scale_constraint: scaleConstraintを使用するか。
+        normal_axis: 円の法線軸("X", "Y", "Z")。
+        orientation_mode: "match"または"world"。
+
+    Returns:
+        (コントローラー名, グループ名, コンストレイントリスト)のタプル。
+
+    Raises:
+        RuntimeError: ターゲットが存在しない場合。
+    """
+    if not cmds.objExists(target):
+        raise RuntimeError(f"Target does not exist: {target}")
+
+    return _apply_controller_plan(
+        _plan_controller(target, input_name),
+        shape_key=shape_key,
+        match_orientation=match_orientation,
+        maintain_offset=maintain_offset,
+        use_scale_constraint=use_scale_constraint,
+        normal_axis=normal_axis,
+        orientation_mode=orientation_mode,
+    )
+
+
+@contextlib.contextmanager
+def _fast_batch_ctx() -> Iterator[None]:
+    """バッチ作成中はEM・サイクルチェック・ビューポート再描画を止め、終了時に元へ戻す。
+
+    コマンドごとのEMグラフ再構築と再描画を避けるためのもので、
+    抜けるときは例外の有無にかかわらず元の状態を復元し、1回だけ再描画する。
+    """
+    prior_em = (cmds.evaluationManager(q=True, mode=True) or ["parallel"])[0]
+    prior_cc = cmds.cycleCheck(q=True, e=True)
+    cmds.evaluationManager(mode="off")
+    cmds.cycleCheck(e=False)
+    cmds.refresh(suspend=True)
+    try:
+        yield
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.cycleCheck(e=prior_cc)
+        cmds.evaluationManager(mode=prior_em)
+        cmds.refresh()
+
+
 # =========================
 # 階層ミラーヘルパー
 # =========================
 
 def _mirror_joint_hierarchy_with_controllers(
         targets: Sequence[str],
-        target_to_ctrl: Dict[str, str],
-        target_to_grp: Dict[str, str],
+        target_info: Dict[str, Tuple[str, str, List[str]]],
 ) -> None:
     """コントローラーでジョイント階層をミラーリングする。
 
@@ -518,34 +635,64 @@ def _mirror_joint_hierarchy_with_controllers(
     - 親が作成済みセットに存在する場合のみ適用
 
     Args:
-        targets: ターゲットノードのシーケンス。
-        target_to_ctrl: ターゲットからコントローラーへのマッピング。
-        target_to_grp: ターゲットからグループへのマッピング。
+        targets: ターゲットノードのシーケンス(`cmds.ls(l=True)`で正規化済みのロングネーム)。
+        target_info: ターゲットから(コントローラー, グループ, コンストレイント)へのマッピング。
     """
-    for t in targets:
-        parents = cmds.listRelatives(t, p=True, f=True) or []
-        if not parents:
-            continue
-        p = parents[0]
-        if p not in target_to_ctrl:
-            continue
-
-        child_grp = target_to_grp.get(t)
-        parent_ctrl = target_to_ctrl.get(p)
-        if not child_grp or not parent_ctrl:
-            continue
-
+    # 親はDAGパスから純Pythonで求める(DGへの問い合わせは行わない)
+    # (リスト版listRelativesは親を重複除去して返すためターゲットと対応付けできない)
+    # 親子とも作成済みのペアだけを先に抽出し、ループ内の分岐を無くす
+    work = [
+        (t, p) for t, p in ((t, t.rpartition("|")[0]) for t in targets if t in target_info)
+        if p in target_info
+    ]
+
+    # 親CTRLごとに子GROUPをまとめ、1回の cmds.parent で複数の子を移す
+    groups: Dict[str, List[str]] = {}
+    for t, p in work:
+        groups.setdefault(target_info[p][0], []).append(target_info[t][1])
+
+    for parent_ctrl, child_grps in groups.items():
         # 子のワールドトランスフォームを保持しながら親子付け
         try:
-            _parent_preserve_world(child_grp, parent_ctrl)
+            mats = [_get_world_matrix(c) for c in child_grps]
+            cmds.parent(*child_grps, parent_ctrl)
+            for c, m in zip(child_grps, mats):
+                cmds.xform(c, ws=True, m=m)
         except Exception:
-            pass
+            # まとめての親子付けに失敗した場合は1つずつ試す(失敗した子は従来どおり無視)
+            for c in child_grps:
+                try:
+                    _parent_preserve_world(c, parent_ctrl)
+                except Exception:
+                    pass
 
 
 # =========================
 # UI
 # =========================
 
+@dataclass(frozen=True)
+class UIOpts:
+    """バッチ作成時に一度だけ取得するUIオプションのスナップショット。
+
+    Attributes:
+        shape_key: 形状の種類。
+        input_name: 命名に使用する入力名。
+        orient_mode: "match"または"world"。
+        normal_axis: 円の法線軸("X", "Y", "Z")。
+        maintain_offset: コンストレイントでオフセットを維持するか。
+        use_scale_constraint: scaleConstraintを使用するか。
+        build_hierarchy: ジョイント階層をミラーリングするか。
+    """
+    shape_key: str
+    input_name: str
+    orient_mode: str
+    normal_axis: str
+    maintain_offset: bool
+    use_scale_constraint: bool
+    build_hierarchy: bool
+
+
 class _UI:
     """コントローラー作成ツールのUIクラス。
 
@@ -563,6 +710,8 @@ class _UI:
         self.chk_maintain_offset: Optional[str] = None
         self.chk_scale_constraint: Optional[str] = None
         self.txt_input_name: Optional[str] = None
+        # UIで選べる形状は円のみ
+        self._shape_key = "Circle"
 
     def build(self) -> None:
         """UIウィンドウを構築して表示する。"""
@@ -607,14 +756,14 @@ class _UI:
 
         cmds.rowLayout(nc=2, cw2=(240, 120), adjustableColumn=1)
         cmds.text(l="Targets (Refresh from selection):")
-        cmds.button(l="Refresh", c=lambda *_: self.refresh_targets())
+        cmds.button(l="Refresh", c=self._cb_refresh)
         cmds.setParent("..")
 
         self.target_list = cmds.textScrollList(numberOfRows=12, allowMultiSelection=True, height=220)
 
         cmds.rowLayout(nc=2, cw2=(240, 240))
-        cmds.button(l="Create + Constrain (ALL)", h=34, c=lambda *_: self.create_for_all())
-        cmds.button(l="Create + Constrain (SELECTED)", h=34, c=lambda *_: self.create_for_selected())
+        cmds.button(l="Create + Constrain (ALL)", h=34, c=self._cb_create_all)
+        cmds.button(l="Create + Constrain (SELECTED)", h=34, c=self._cb_create_selected)
         cmds.setParent("..")
 
         cmds.separator(h=8, style="in")
@@ -630,13 +779,25 @@ class _UI:
 
         cmds.showWindow(self.win)
 
+    def _cb_refresh(self, *_) -> None:
+        """Refreshボタンのコールバック(Mayaが渡す引数は無視)。"""
+        self.refresh_targets()
+
+    def _cb_create_all(self, *_) -> None:
+        """Create(ALL)ボタンのコールバック(Mayaが渡す引数は無視)。"""
+        self.create_for_all()
+
+    def _cb_create_selected(self, *_) -> None:
+        """Create(SELECTED)ボタンのコールバック(Mayaが渡す引数は無視)。"""
+        self.create_for_selected()
+
     def _get_shape_key(self) -> str:
         """現在選択されている形状キーを取得する。
 
         Returns:
             形状キー文字列。
         """
-        return "Circle"
+        return self._shape_key
 
     def _opt_orientation_mode(self) -> str:
         """UIから方向モードを取得する。
@@ -712,13 +873,29 @@ class _UI:
         """
         return list(cmds.textScrollList(self.target_list, q=True, selectItem=True) or [])
 
+    def _snapshot(self) -> UIOpts:
+        """現在のUIオプションをまとめて取得する。
+
+        Returns:
+            UIオプションのスナップショット。
+        """
+        return UIOpts(
+            shape_key=self._get_shape_key(),
+            input_name=self._opt_input_name(),
+            orient_mode=self._opt_orientation_mode(),
+            normal_axis=self._opt_normal_axis(),
+            maintain_offset=self._opt_maintain_offset(),
+            use_scale_constraint=self._opt_scale_constraint(),
+            build_hierarchy=self._opt_build_hierarchy(),
+        )
+
     def create_for_all(self) -> None:
         """リスト内のすべてのターゲットに対してコントローラーを作成する。"""
         targets = self._get_all_targets_in_list()
         if not targets:
             cmds.warning("List is empty.")
             return
-        self._create_batch(targets)
+        self._create_batch(targets, self._snapshot())
 
     def create_for_selected(self) -> None:
         """リスト内で選択されているターゲットに対してコントローラーを作成する。"""
@@ -726,55 +903,92 @@ class _UI:
         if not targets:
             cmds.warning("No selection in list.")
             return
-        self._create_batch(targets)
+        self._create_batch(targets, self._snapshot())
 
-    def _create_batch(self, targets: Sequence[str]) -> None:
+    def _create_batch(self, targets: Sequence[str], opts: UIOpts) -> None:
         """複数のターゲットに対してバッチでコントローラーを作成する。
 
         Args:
             targets: コントローラーを作成するターゲットのシーケンス。
+            opts: `_snapshot` で取得したUIオプション。
         """
-        shape_key = self._get_shape_key()
-        input_name = self._opt_input_name()
-        orientation_mode = self._opt_orientation_mode()
-        match_orient = (orientation_mode == "match")
-        normal_axis = self._opt_normal_axis()
-
-        maintain_offset = self._opt_maintain_offset()
-        use_scale_constraint = self._opt_scale_constraint()
-        build_hierarchy = self._opt_build_hierarchy()
+        input_name = opts.input_name
+        match_orient = (opts.orient_mode == "match")
 
         created: List[str] = []
-        target_to_ctrl: Dict[str, str] = {}
-        target_to_grp: Dict[str, str] = {}
+        failed: List[Tuple[str, Exception]] = []
+        target_info: Dict[str, Tuple[str, str, List[str]]] = {}
+
+        # ロングネームへの正規化と重複除去を1回のlsで行う
+        # (同名ノードの曖昧さを排除し、以降の再解決を省く。ミラー処理もこの結果をそのまま使う)
+        long_targets: List[str] = cmds.ls(list(targets), long=True) or []
+        resolved = set(long_targets)
+        # UI更新後に削除/リネームされたエントリ
+        failed.extend((t, RuntimeError(f"Target does not exist: {t}")) for t in targets if t not in resolved)
+
+        # トランスフォーム(ジョイント含む)以外は作成パイプラインに入れず、まとめて除外する
+        # (空リストの ls はシーン全体を返すので、有効なターゲットがある時だけ問い合わせる)
+        transforms = set(cmds.ls(long_targets, type="transform", long=True) or []) if long_targets else set()
+        failed.extend((t, RuntimeError(f"Target is not a transform: {t}")) for t in long_targets if t not in transforms)
+        long_targets = [t for t in long_targets if t in transforms]
+
+        # 有効なターゲットが無ければシーン状態を切り替えずに終える
+        if not long_targets:
+            cmds.warning("Failures:\n" + "\n".join(f"- {t}: {e}" for t, e in failed))
+            return
 
-        cmds.undoInfo(openChunk=True)
-        try:
-            # 1) コントローラーを作成(独立)
-            for t in targets:
-                try:
-                    ctrl, grp, cons = create_controller_for_target(
-                        target=t,
-                        shape_key=shape_key,
-                        input_name=input_name,
-                        match_orientation=match_orient,
-                        maintain_offset=maintain_offset,
-                        use_scale_constraint=use_scale_constraint,
-                        normal_axis=normal_axis,
-                        orientation_mode=orientation_mode,
-                    )
-                    created.append(ctrl)
-                    target_to_ctrl[t] = ctrl
-                    target_to_grp[t] = grp
-                except Exception as e:
-                    cmds.warning(f"Failed {t}: {e}")
-
-            # 2) 階層をミラーリング(グループを親コントローラー下に配置)
-            if build_hierarchy and target_to_ctrl:
-                _mirror_joint_hierarchy_with_controllers(targets, target_to_ctrl, target_to_grp)
-
-        finally:
-            cmds.undoInfo(closeChunk=True)
+        # バッチ中はEMグラフの再構築・サイクルチェック・ビューポート再描画を止める
+        with _fast_batch_ctx():
+            # バッチ全体を名前付きの1つのアンドゥ項目にまとめる
+            cmds.undoInfo(openChunk=True, chunkName=f"{WINDOW_NAME}_{input_name.strip() or 'CTL'}")
+            try:
+                # 1) 作成計画を先にまとめて立て(ワールドマトリックスもここで一括取得)、
+                #    その後シーンへ順に適用する
+                plans: List[_ControllerPlan] = []
+                # ジョイントルート探索の結果はバッチ内でキャッシュする
+                root_cache: Dict[str, str] = {}
+                # バッチ内で払い出した名前(作成済みなので objExists を引かずに済む)
+                taken_names: Set[str] = set()
+                for t in long_targets:
+                    try:
+                        plans.append(_plan_controller(t, input_name, root_cache))
+                    except RuntimeError as e:
+                        failed.append((t, e))
+
+                # ルートグループは多くのターゲットで共有されるので、存在確認は1回のlsで済ませる
+                # (空リストの ls は全ノードを返すので計画が無いときは問い合わせない)
+                root_names = list({p.root_grp_name for p in plans})
+                existing_roots: Set[str] = set(cmds.ls(root_names) or []) if root_names else set()
+
+                for plan in plans:
+                    try:
+                        # 引数は位置指定で渡す(ターゲットごとのkwargs辞書構築を避ける)
+                        ctrl, grp, cons = _apply_controller_plan(
+                            plan,
+                            opts.shape_key,
+                            match_orient,
+                            opts.maintain_offset,
+                            opts.use_scale_constraint,
+                            opts.normal_axis,
+                            opts.orient_mode,
+                            taken_names,
+                            existing_roots,
+                        )
+                        created.append(ctrl)
+                        target_info[plan.target] = (ctrl, grp, cons)
+                    except RuntimeError as e:
+                        # 警告はループ後にまとめて1回だけ出力する
+                        failed.append((plan.target, e))
+
+                # 2) 階層をミラーリング(グループを親コントローラー下に配置)
+                if opts.build_hierarchy and target_info:
+                    _mirror_joint_hierarchy_with_controllers(long_targets, target_info)
+
+            finally:
+                cmds.undoInfo(closeChunk=True)
+
+        if failed:
+            cmds.warning("Failures:\n" + "\n".join(f"- {t}: {e}" for t, e in failed))
 
         if created:
             cmds.select(created, r=True)
@@ -784,12 +998,21 @@ class _UI:
 _UI_INSTANCE: Optional[_UI] = None
 
 
-def run() -> None:
+def run(rebuild: bool = False) -> None:
     """UIを実行する。
 
-    新しいUIインスタンスを作成して表示します。
+    既存のウィンドウがこのモジュールのUIインスタンスで開かれていれば再構築せずに表示し、
+    それ以外は新しいUIインスタンスを作成して表示します。
+
+    Args:
+        rebuild: Trueの場合は既存ウィンドウがあっても作り直す。
     """
     global _UI_INSTANCE
+    # モジュールのリロード後は _UI_INSTANCE が None に戻り、古いウィンドウのコールバックが
+    # 旧インスタンスを指したままなので、その場合は作り直す
+    if not rebuild and _UI_INSTANCE is not None and cmds.window(WINDOW_NAME, exists=True):
+        cmds.showWindow(WINDOW_NAME)
+        return
     _UI_INSTANCE = _UI()
     _UI_INSTANCE.build()
 
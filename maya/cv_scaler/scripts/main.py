@@ -24,11 +24,12 @@ def _selected_nurbs_shapes() -> List[Tuple[str, str]]:
     sel = cmds.ls(sl=True, long=True) or []
     results: List[Tuple[str, str]] = []
     for node in sel:
-        shapes = cmds.listRelatives(node, shapes=True, fullPath=True) or []
+        # type フィルタで NURBS の shape だけを Maya 側で絞り込む（shape ごとの nodeType 呼び出しを省く）
+        shapes = cmds.listRelatives(
+            node, shapes=True, fullPath=True, type=("nurbsCurve", "nurbsSurface")
+        ) or []
         for s in shapes:
-            t = cmds.nodeType(s)
-            if t in ("nurbsCurve", "nurbsSurface"):
-                results.append((node, s))
+            results.append((node, s))
     return results
 
 
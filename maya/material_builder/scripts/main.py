@@ -11,6 +11,7 @@ import importlib, my_sp2ai; importlib.reload(my_sp2ai); my_sp2ai.run()
 対応:Maya 2020+ / Arnold(MtoA)
 """
 
+from functools import lru_cache, partial
 from typing import Dict, Optional, Tuple
 import os
 import re
@@ -29,6 +30,32 @@ DEFAULT_PATTERNS = {
     "normal": r"(?:normal|norm|nrm)(?!.*(?:rough|metal|base))",
 }
 
+@lru_cache(maxsize=64)
+def _compile_pattern(pat: str) -> "re.Pattern":
+    """チャンネル用の正規表現をコンパイルしてキャッシュする（大文字小文字は区別しない）"""
+    return re.compile(pat, re.IGNORECASE)
+
+
+# 既定パターンはモジュール読み込み時に一度だけコンパイル
+_COMPILED_PATTERNS = {k: _compile_pattern(v) for k, v in DEFAULT_PATTERNS.items()}
+
+# 優先拡張子（上から優先）→ 順位
+_EXT_ORDER = {e: i for i, e in enumerate((".tx", ".exr", ".png", ".tif", ".tiff", ".jpg", ".jpeg", ".bmp"))}
+
+
+def _ext_score(name: str) -> int:
+    """拡張子の優先順位を返す（小さいほど優先、未知の拡張子は最後）"""
+    return _EXT_ORDER.get(os.path.splitext(name)[1].lower(), len(_EXT_ORDER))
+
+
+# place2dTexture → file の一般的な接続（src属性, dst属性）
+_PLACE2D_CONNECTIONS = tuple((a, a) for a in (
+    "coverage", "translateFrame", "rotateFrame", "mirrorU", "mirrorV",
+    "stagger", "wrapU", "wrapV", "repeatUV", "offset", "rotateUV",
+    "noiseUV", "vertexUvOne", "vertexUvTwo", "vertexUvThree",
+    "vertexCameraOne",
+)) + (("outUV", "uvCoord"), ("outUvFilterSize", "uvFilterSize"))
+
 # カラースペースの規定
 
 COLORSPACE_RULES = {
@@ -46,6 +73,17 @@ EXPLANATIONS = {
     "normal": "Normal（法線・例: *_Normal.png, *_Norm.tif, *_nrm.exr）",
 }
 
+# UIの例表示（説明文の「例: 」以降をロード時に一度だけ切り出す）
+_EXAMPLES = {k: v.rsplit("例: ", 1)[-1].rstrip("）") for k, v in EXPLANATIONS.items()}
+
+# 個別指定フォームのチャンネル（キー, 表示名）
+_CHANNEL_ROWS = (
+    ("basecolor", "BaseColor"),
+    ("metalness", "Metalness"),
+    ("roughness", "Roughness"),
+    ("normal", "Normal"),
+)
+
 
 
 # コア機能
@@ -66,23 +104,19 @@ def find_maps_in_dir(
     if not directory or not os.path.isdir(directory):
         return result
 
-    files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
-    # 優先拡張子（上から優先）
-    exts = (".tx", ".exr", ".png", ".tif", ".tiff", ".jpg", ".jpeg", ".bmp")
+    with os.scandir(directory) as it:
+        files = [e.name for e in it if e.is_file()]
 
     # Substance標準の「*_BaseColor.png」などを想定しつつ、柔軟にマッチ
     for chan, pat in patterns.items():
-        regex = re.compile(pat, re.IGNORECASE)
+        if patterns is DEFAULT_PATTERNS:
+            regex = _COMPILED_PATTERNS[chan]
+        else:
+            regex = _compile_pattern(pat)
         candidates = [f for f in files if regex.search(f)]
         # 拡張子優先順位で選ぶ
-        def score(name: str) -> int:
-            for i, e in enumerate(exts):
-                if name.lower().endswith(e):
-                    return i
-            return len(exts) + 1
-
         if candidates:
-            best = sorted(candidates, key=score)[0]
+            best = min(candidates, key=_ext_score)
             result[chan] = os.path.join(directory, best)
 
     return result
@@ -90,22 +124,17 @@ def find_maps_in_dir(
 
 def make_place2d_and_connect(file_node: str) -> str:
     """place2dTexture を作成し、file ノードに一般的な属性接続を行う"""
-    p2d = cmds.shadingNode("place2dTexture", asUtility=True)
-    # よくある接続セット
-    attrs = [
-        "coverage", "translateFrame", "rotateFrame", "mirrorU", "mirrorV",
-        "stagger", "wrapU", "wrapV", "repeatUV", "offset", "rotateUV",
-        "noiseUV", "vertexUvOne", "vertexUvTwo", "vertexUvThree",
-        "vertexCameraOne", "outUV", "outUvFilterSize"
-    ]
-    for a in attrs:
-        src = f"{p2d}.{a}"
-        dst = f"{file_node}.{a}"
-        if cmds.objExists(src) and cmds.objExists(dst):
+    cmds.undoInfo(openChunk=True)
+    try:
+        p2d = cmds.shadingNode("place2dTexture", asUtility=True)
+        # よくある接続セット（属性は place2dTexture / file に常に存在するので存在確認は省く）
+        for src_attr, dst_attr in _PLACE2D_CONNECTIONS:
             try:
-                cmds.connectAttr(src, dst, f=True)
+                cmds.connectAttr(f"{p2d}.{src_attr}", f"{file_node}.{dst_attr}", f=True)
             except RuntimeError:
                 pass
+    finally:
+        cmds.undoInfo(closeChunk=True)
     return p2d
 
 
@@ -250,7 +279,8 @@ def find_maps_by_sample(sample_path: str) -> Dict[str, Optional[str]]:
 
     files = set(os.listdir(directory))
 
-    PREFERRED_EXTS = [ext] + [e for e in [".tx", ".exr", ".png", ".tif", ".tiff", ".jpg", ".jpeg", ".bmp"] if e != ext]
+    # サンプルと同じ拡張子を最優先し、残りは _EXT_ORDER の順位で試す
+    PREFERRED_EXTS = [ext] + [e for e in _EXT_ORDER if e != ext]
 
     def find_existing(base_core: str) -> Optional[str]:
         for e in PREFERRED_EXTS:
@@ -298,6 +328,16 @@ class SP2AIWindow:
         if cmds.window(self.WINDOW, exists=True):
             cmds.deleteUI(self.WINDOW)
 
+        # コントロール生成ごとにビューポートが再描画されないよう、構築中は描画を止める
+        cmds.refresh(suspend=True)
+        try:
+            win = self._build_layout()
+        finally:
+            cmds.refresh(suspend=False)
+        cmds.showWindow(win)
+
+    def _build_layout(self) -> str:
+        """ウィンドウとレイアウトを組み立てて、ウィンドウ名を返す。"""
         win = cmds.window(self.WINDOW, title="SP → aiStandardSurface Builder", sizeable=True)
         form = cmds.formLayout()
         main = cmds.columnLayout(adj=True, rowSpacing=8)
@@ -314,18 +354,13 @@ class SP2AIWindow:
         cmds.frameLayout(label="自動検索", collapsable=False, borderVisible=True, marginHeight=4)
         row = cmds.rowLayout(numberOfColumns=2, adjustableColumn=1, columnAttach=(1, "both", 4), columnWidth2=(300, 80))
         self.auto_file_field = cmds.textField(text="", h=24, ann="任意の1ファイルを選択すると、同名テクスチャセットを自動検索します")
-        cmds.button(label="参照", h=24, c=lambda *_: self._pick_auto_file())
+        cmds.button(label="参照", h=24, c=self._pick_auto_file)
         cmds.setParent("..")
         cmds.setParent("..")
 
         # 個別ファイル指定
         cmds.frameLayout(label="個別指定（自動検出より優先）", collapsable=False, borderVisible=True, marginHeight=4)
-        for key, title in [
-            ("basecolor", "BaseColor"),
-            ("metalness", "Metalness"),
-            ("roughness", "Roughness"),
-            ("normal", "Normal"),
-        ]:
+        for key, title in _CHANNEL_ROWS:
             # 1行目: 入力欄 + 参照 + ステータス
             row = cmds.rowLayout(numberOfColumns=3, adjustableColumn=1,
                                  columnAttach=[(1, "both", 4), (2, "both", 4), (3, "both", 4)],
@@ -334,13 +369,13 @@ class SP2AIWindow:
                 label=title, buttonLabel="参照", text="",
                 ann=EXPLANATIONS[key],
                 columnAlign=(1, "left"),
-                bc=lambda *_ , k=key: self._pick_file(k)
+                bc=partial(self._pick_file, key)
             )
             status = cmds.text(label="—", align="center", w=30, ann="選択/検出の状態（✓=OK, —=未指定）")
             cmds.setParent("..")
 
             # 2行目: 例表示（薄いガイド）
-            ex = cmds.text(label="例: " + EXPLANATIONS[key].split("（例: ")[-1].rstrip("）"), align="left", enable=False)
+            ex = cmds.text(label="例: " + _EXAMPLES[key], align="left", enable=False)
             cmds.separator(h=6, style="none")
 
             self.fields[key] = grp
@@ -354,21 +389,21 @@ class SP2AIWindow:
         cmds.button(
             label="▶ マテリアル作成", h=36, bgc=(0.25, 0.5, 0.25),
             ann="指定されたテクスチャから aiStandardSurface を自動構築します",
-            c=lambda *_: self._build()
+            c=self._build
         )
         cmds.button(
             label="▶ 作成して適用", h=36, bgc=(0.25, 0.35, 0.55),
             ann="マテリアルを作成し、選択されたオブジェクトへ適用します",
-            c=lambda *_: self._build_and_apply()
+            c=self._build_and_apply
         )
         cmds.setParent("..")
 
         cmds.formLayout(form, e=True,
                         attachForm=[(main, "top", 10), (main, "left", 10), (main, "right", 10), (main, "bottom", 10)])
-        cmds.showWindow(win)
+        return win
 
     # ---------- UI helpers ----------
-    def _pick_auto_file(self):
+    def _pick_auto_file(self, *_):
         f = cmds.fileDialog2(dialogStyle=2, fileMode=1,
                              fileFilter="Images (*.tx *.exr *.png *.tif *.tiff *.jpg *.jpeg *.bmp)")
         if f:
@@ -380,7 +415,7 @@ class SP2AIWindow:
                     cmds.textFieldButtonGrp(self.fields[k], e=True, text=p)
             self._update_status()
 
-    def _pick_file(self, key: str) -> None:
+    def _pick_file(self, key: str, *_) -> None:
         f = cmds.fileDialog2(dialogStyle=2, fileMode=1,
                              fileFilter="Images (*.tx *.exr *.png *.tif *.tiff *.jpg *.jpeg *.bmp)")
         if f:
@@ -410,7 +445,7 @@ class SP2AIWindow:
             label = "✓" if ok else "—"
             cmds.text(self.status_labels[k], e=True, label=label)
 
-    def _build(self) -> None:
+    def _build(self, *_) -> None:
         """作成ボタン押下時の処理."""
         mat_name, maps = self._gather_inputs()
 
@@ -429,7 +464,7 @@ class SP2AIWindow:
         cmds.inViewMessage(amg=f"<hl>作成完了:</hl> {mat} / {sg}<br>{'<br>'.join(used)}",
                            pos="midCenter", fade=True, alpha=.9)
 
-    def _build_and_apply(self) -> None:
+    def _build_and_apply(self, *_) -> None:
         mat_name, maps = self._gather_inputs()
 
         if not mat_name:
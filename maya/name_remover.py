@@ -16,14 +16,44 @@ def _is_referenced(node):
     except:
         return False
 
+class _NodeCache(object):
+    """1回の実行中に同じノードへ何度も投げる問い合わせ（参照/DAG判定/ロック）の結果を覚えておく"""
+    def __init__(self):
+        self.ref = {}
+        self.is_dag = {}
+        self.lock = {}
+
+    def referenced(self, node):
+        if node not in self.ref:
+            self.ref[node] = _is_referenced(node)
+        return self.ref[node]
+
+    def dag(self, node):
+        if node not in self.is_dag:
+            self.is_dag[node] = cmds.objectType(node, isAType='dagNode')
+        return self.is_dag[node]
+
+    def prime_locked(self, nodes):
+        # lockNode -q は複数ノードを渡すと順番どおりに bool のリストを返すので1回で済ませる
+        if not nodes: return
+        try:
+            states = cmds.lockNode(nodes, q=True, l=True) or []
+        except: return
+        if len(states) == len(nodes):
+            self.lock.update(zip(nodes, states))
+
+    def locked(self, node):
+        if node not in self.lock:
+            states = cmds.lockNode(node, q=True, l=True)
+            self.lock[node] = bool(states and states[0])
+        return self.lock[node]
+
 def _short_dag_name(path):
     return path.split("|")[-1]
 
 def _split_namespace(name):
-    if ':' in name:
-        ns, base = name.rsplit(':', 1)
-        return ns, base
-    return '', name
+    ns, sep, base = name.rpartition(':')
+    return (ns, base) if sep else ('', name)
 
 def _to_node_names(things):
     if not things: return []
@@ -37,16 +67,23 @@ def _to_node_names(things):
     return list(dict.fromkeys(clean))
 
 # ------- 置換ユーティリティ（大小無視やNS適用に対応） -------
-def _replace_text(text, remove_str, ignore_case):
+def _remove_pattern(remove_str, ignore_case):
+    """大小無視のときだけ、削除文字列の正規表現を1回コンパイルして返す（それ以外は None）"""
+    if ignore_case and remove_str:
+        return re.compile(re.escape(remove_str), re.IGNORECASE)
+    return None
+
+def _replace_text(text, remove_str, pat=None):
     if not remove_str:
         return text
-    if ignore_case:
-        return re.sub(re.escape(remove_str), "", text, flags=re.IGNORECASE)
+    if pat is not None:
+        return pat.sub("", text)
     else:
         return text.replace(remove_str, "")
 
 # ------- 対象収集 -------
-def _gather_targets(include_shapes=False, include_connected=False, include_deformers=False):
+def _gather_targets(include_shapes=False, include_connected=False, include_deformers=False, cache=None):
+    if cache is None: cache = _NodeCache()
     sel = cmds.ls(selection=True, long=True) or []
     if not sel:
         cmds.warning(u"何も選択されていません。アウトライナ等でルートを選択してください。")
@@ -55,13 +92,15 @@ def _gather_targets(include_shapes=False, include_connected=False, include_defor
     desc = cmds.listRelatives(sel, allDescendents=True, fullPath=True) or []
     dag_nodes = sel + desc
 
-    dag_filtered = []
+    # 型・参照の判定は ls の型フィルタでまとめて行う（joint は transform の派生なので含まれる）
+    keep = set(cmds.ls(dag_nodes, type='transform', long=True) or [])
+    if include_shapes:
+        keep.update(cmds.ls(dag_nodes, type='shape', long=True) or [])
+    referenced = set(cmds.ls(dag_nodes, referencedNodes=True, long=True) or [])
     for n in dag_nodes:
-        if _is_referenced(n): continue
-        if cmds.objectType(n, isAType='transform') or cmds.nodeType(n) == 'joint':
-            dag_filtered.append(n)
-        elif include_shapes and cmds.objectType(n, isAType='shape'):
-            dag_filtered.append(n)
+        cache.ref[n] = n in referenced
+    # 親子を同時に選択した場合の重複を除いておく（同じノードを二度リネームしない）
+    dag_filtered = [n for n in dict.fromkeys(dag_nodes) if n in keep and n not in referenced]
 
     dg_nodes = set()
     if include_connected:
@@ -74,110 +113,118 @@ def _gather_targets(include_shapes=False, include_connected=False, include_defor
         raw_conn = cmds.listConnections(dag_nodes, s=True, d=True, c=False) or []
         conn_nodes = _to_node_names(raw_conn)
 
-        for h in (hist_nodes + conn_nodes):
-            if _is_referenced(h): continue
-            if not cmds.objExists(h): continue
-            if cmds.objectType(h, isAType='dagNode'):  # DAGは別で処理
-                continue
-            htype = cmds.nodeType(h)
+        cand = list(dict.fromkeys(hist_nodes + conn_nodes))
+        # ノードタイプは ls -showType で「名前, 型」の交互リストとして1回で取得する（存在しないノードは返らない）
+        flat = (cmds.ls(cand, showType=True) or []) if cand else []
+        for h, htype in zip(flat[0::2], flat[1::2]):
             if (not include_deformers) and (htype in DEFAULT_DEFORMER_BLACKLIST): continue
             if htype in SAFETY_BLACKLIST: continue
+            if cache.referenced(h): continue
+            if cache.dag(h):  # DAGは別で処理
+                continue
             dg_nodes.add(h)
 
+    # 深さは key= で要素ごとに一度だけ計算される（比較のたびに数え直さない）
     dag_filtered.sort(key=lambda x: x.count("|"), reverse=True)
     return dag_filtered + sorted(dg_nodes)
 
 # ------- リネーム -------
-def _rename_node(node, remove_str, apply_ns, ignore_case):
+def _predict_name(node, remove_str, apply_ns, pat=None, cache=None):
+    """(表示用の旧名, 新しい名前) を返す。名前が変わらない場合、新しい名前は None"""
+    if cache is None: cache = _NodeCache()
+    old = _short_dag_name(node) if cache.dag(node) else node  # DAGは短名でリネーム（短名にNSは基本ないが保険）
+    ns, base = _split_namespace(old)
+    new_ns   = _replace_text(ns,   remove_str, pat) if apply_ns else ns
+    new_base = _replace_text(base, remove_str, pat)
+    new = (new_ns + ":" if new_ns else "") + new_base
+    return old, (new if new_base and new != old else None)
+
+def _rename_node(node, new_name, cache=None):
+    """リネームして、失敗した場合はエラー文字列を返す"""
+    if cache is None: cache = _NodeCache()
     try:
         try:
-            lock_states = cmds.lockNode(node, q=True, l=True)
-            if lock_states and lock_states[0]:
+            if cache.locked(node):
                 cmds.lockNode(node, l=False)
         except: pass
-
-        if cmds.objectType(node, isAType='dagNode'):
-            short = _short_dag_name(node)
-            ns, base = _split_namespace(short)  # DAG短名にNSは基本ないが保険
-            new_ns  = _replace_text(ns,   remove_str, ignore_case) if apply_ns else ns
-            new_base= _replace_text(base, remove_str, ignore_case)
-            new_short = (new_ns + ":" if new_ns else "") + new_base
-            if new_base and new_short != short:
-                cmds.rename(node, new_short)
-                return (short, new_short)
-            return None
-        else:
-            ns, base = _split_namespace(node)
-            new_ns   = _replace_text(ns,   remove_str, ignore_case) if apply_ns else ns
-            new_base = _replace_text(base, remove_str, ignore_case)
-            new_full = (new_ns + ":" if new_ns else "") + new_base
-            if new_base and new_full != node:
-                cmds.rename(node, new_full)
-                return (node, new_full)
-            return None
+        cmds.rename(node, new_name)
+        return None
     except Exception as e:
-        return (u"{} (失敗)".format(node), u"{}".format(e))
+        return u"{}".format(e)
 
 def _bulk_remove(remove_str, include_shapes=False, include_connected=False, include_deformers=False,
-                 apply_ns=False, ignore_case=False, dry_run=False):
+                 apply_ns=False, ignore_case=False, dry_run=False, plan=None, undoable=True):
+    """plan にリストを渡すと (ノード, 旧名, 新しい名前) の予測結果を入れる（_bulk_apply にそのまま渡せる）"""
     if not remove_str:
         cmds.warning(u"削除する文字列が空です。"); return 0, 0, []
-    targets = _gather_targets(include_shapes, include_connected, include_deformers)
+    cache = _NodeCache()  # 収集・プレビュー・リネームで同じノードへの問い合わせを共有
+    pat = _remove_pattern(remove_str, ignore_case)  # 置換用の正規表現はここで1回だけ作る
+    targets = _gather_targets(include_shapes, include_connected, include_deformers, cache)
     if not targets: return 0, 0, []
 
-    log, renamed = [], 0
+    # 参照ノードは _gather_targets の時点で除外済みなので、ここでは新しい名前の予測だけ行う
+    entries = [(n,) + _predict_name(n, remove_str, apply_ns, pat, cache) for n in targets]
+    if plan is not None: plan[:] = entries
+    if not dry_run:
+        return _bulk_apply(entries, cache, undoable)
+
+    log = [u"{} -> {}".format(old, new) if new else u"(変更なし) {}".format(old) for _n, old, new in entries]
+    return len(entries), sum(1 for e in entries if e[2]), log
+
+def _bulk_apply(entries, cache=None, undoable=True):
+    """予測済みの (ノード, 旧名, 新しい名前 or None) を順にリネームする（名前の計算はやり直さない）"""
+    if cache is None: cache = _NodeCache()
+    # ログは対象1件につき1行なので先に確保して添字で埋める
+    log, renamed = [None] * len(entries), 0
+    # undoable=False ではリネーム中だけアンドゥの記録を止める（既存の履歴は flush しない）
+    undo_was_on = (not undoable) and cmds.undoInfo(q=True, state=True)
     try:
-        cmds.undoInfo(openChunk=True)
-        if not dry_run:
-            try:
-                if not cmds.progressWindow(query=True, isProgressBar=True):
-                    cmds.progressWindow(title=u"リネーム中", status=u"処理中...", isInterruptable=True, max=len(targets))
-            except: pass
+        if undoable:
+            cmds.undoInfo(openChunk=True)
+        elif undo_was_on:
+            cmds.undoInfo(stateWithoutFlush=False)
+        cache.prime_locked([n for n, _old, new in entries if new])  # ロック状態は1回の問い合わせでまとめて取得しておく
+        try:
+            if not cmds.progressWindow(query=True, isProgressBar=True):
+                cmds.progressWindow(title=u"リネーム中", status=u"処理中...", isInterruptable=True, max=len(entries))
+        except: pass
 
-        for i, n in enumerate(targets, 1):
-            if _is_referenced(n):
-                log.append(u"(参照のためスキップ) {}".format(n))
+        # プログレスバーの更新と中断確認は全体で200回程度に間引く（1件ごとのUI更新を避ける）
+        step = max(1, len(entries) // 200)
+        for i, (n, old, new) in enumerate(entries, 1):
+            if new is None:
+                log[i-1] = u"(変更なし) {}".format(old)
             else:
-                if dry_run:
-                    disp_old = _short_dag_name(n) if cmds.objectType(n, isAType='dagNode') else n
-                    ns, base = _split_namespace(disp_old)
-                    new_ns   = _replace_text(ns,   remove_str, ignore_case) if apply_ns else ns
-                    new_base = _replace_text(base, remove_str, ignore_case)
-                    disp_new = (new_ns + ":" if new_ns else "") + new_base
-                    if new_base and disp_new != disp_old:
-                        log.append(u"{} -> {}".format(disp_old, disp_new))
-                    else:
-                        log.append(u"(変更なし) {}".format(disp_old))
+                err = _rename_node(n, new, cache)
+                if err is None:
+                    renamed += 1
+                    log[i-1] = u"{} -> {}".format(old, new)
                 else:
-                    res = _rename_node(n, remove_str, apply_ns, ignore_case)
-                    if res and "失敗" not in res[0]:
-                        renamed += 1
-                        log.append(u"{} -> {}".format(res[0], res[1]))
-                    elif res is None:
-                        disp_old = _short_dag_name(n) if cmds.objectType(n, isAType='dagNode') else n
-                        log.append(u"(変更なし) {}".format(disp_old))
-                    else:
-                        log.append(u"(失敗) {} : {}".format(res[0], res[1]))
-
-            if not dry_run:
+                    log[i-1] = u"(失敗) {} : {}".format(n, err)
+
+            if i % step == 0 or i == len(entries):
                 try:
                     if cmds.progressWindow(query=True, isCancelled=True):
+                        del log[i:]
                         log.append(u"ユーザーにより中断されました。"); break
                     cmds.progressWindow(edit=True, progress=i)
                 except: pass
     finally:
-        if not dry_run:
-            try: cmds.progressWindow(endProgress=True)
-            except: pass
-        cmds.undoInfo(closeChunk=True)
+        try: cmds.progressWindow(endProgress=True)
+        except: pass
+        if undoable:
+            cmds.undoInfo(closeChunk=True)
+        elif undo_was_on:
+            cmds.undoInfo(stateWithoutFlush=True)
 
-    return len(targets), renamed, log
+    return len(entries), renamed, log
 
 # ------- プレビュー -------
-def _show_preview_dialog(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case):
-    total, _would, log = _bulk_remove(remove_str, include_shapes, include_connected, include_deformers,
-                                      apply_ns, ignore_case, dry_run=True)
-    would_count = sum(1 for l in log if "->" in l)
+def _show_preview_dialog(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case,
+                         undoable=True):
+    plan = []  # 『この内容で実行』ではこの予測結果をそのままリネームする
+    total, would_count, log = _bulk_remove(remove_str, include_shapes, include_connected, include_deformers,
+                                           apply_ns, ignore_case, dry_run=True, plan=plan)
     head = u"[プレビュー] 対象: {} 件 / 名前変更が起きる可能性: {} 件\n".format(total, would_count)
     body = u"\n".join(log) if log else u"(対象なし)"
 
@@ -190,8 +237,8 @@ def _show_preview_dialog(remove_str, include_shapes, include_connected, include_
                         align="left", fn="boldLabelFont")
     sf = cmds.scrollField(editable=False, wordWrap=False, text=body)
     btn_run   = cmds.button(l=u"この内容で実行", bgc=(0.4,0.7,0.4),
-                            c=lambda *_: _run_from_preview(win, remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case))
-    btn_save  = cmds.button(l=u"ログを保存...", c=lambda *_: _save_preview_log(head + u"\n" + body))
+                            c=lambda *_: _run_from_preview(win, plan, undoable))
+    btn_save  = cmds.button(l=u"ログを保存...", c=lambda *_: _save_preview_log((head, u"\n", body)))
     btn_close = cmds.button(l=u"閉じる", c=lambda *_: cmds.deleteUI(win))
 
     m=6
@@ -206,22 +253,20 @@ def _show_preview_dialog(remove_str, include_shapes, include_connected, include_
     )
     cmds.showWindow(win)
 
-def _run_from_preview(win, remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case):
-    total, renamed, log = _bulk_remove(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case, dry_run=False)
+def _run_from_preview(win, plan, undoable=True):
+    total, renamed, log = _bulk_apply(plan, undoable=undoable)
     cmds.inViewMessage(amg=u"<hl>リネーム完了</hl>: 対象 {} / 変更 {} 件".format(total, renamed),
                        pos="midCenter", fade=True, alpha=0.9)
     print(u"[結果] 対象: {} / 変更: {}".format(total, renamed))
     for line in log: print(line)
     if cmds.window(win, exists=True): cmds.deleteUI(win)
 
-def _save_preview_log(text):
+def _save_preview_log(parts):
+    # 表示用に組み立て済みの文字列を順に書き出す（保存のためだけに全体を連結し直さない）
     path = cmds.fileDialog2(fileFilter="Text (*.txt)", dialogStyle=2, caption=u"ログを保存", fileMode=0)
     if not path: return
     try:
-        try:
-            with open(path[0], 'w', encoding='utf-8') as f: f.write(text)
-        except TypeError:
-            with open(path[0], 'w') as f: f.write(text.encode('utf-8'))
+        with open(path[0], 'w', encoding='utf-8') as f: f.writelines(parts)
         cmds.inViewMessage(amg=u"ログを保存しました: {}".format(path[0]), pos="topCenter", fade=True)
     except Exception as e:
         cmds.warning(u"ログ保存に失敗: {}".format(e))
@@ -240,6 +285,7 @@ def _make_ui():
     cb_apply_ns    = cmds.checkBox('BR_applyNS',          label=u"ネームスペースにも適用（:の左側も置換）", v=True)
     cb_ignore_case = cmds.checkBox('BR_ignoreCase',       label=u"大文字小文字を無視して置換", v=True)
     cb_preview     = cmds.checkBox('BR_previewCB',        label=u"実行前にプレビューを表示", v=True)
+    cb_undoable    = cmds.checkBox('BR_undoableCB',       label=u"アンドゥ可能にする（OFFで大量リネームが速くなるが元に戻せない）", v=True)
 
     def _do_preview(*_):
         remove_str = cmds.textFieldGrp(tf, q=True, text=True)
@@ -248,7 +294,8 @@ def _make_ui():
         include_deformers = cmds.checkBox(cb_deformers, q=True, v=True)
         apply_ns          = cmds.checkBox(cb_apply_ns, q=True, v=True)
         ignore_case       = cmds.checkBox(cb_ignore_case, q=True, v=True)
-        _show_preview_dialog(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case)
+        undoable          = cmds.checkBox(cb_undoable, q=True, v=True)
+        _show_preview_dialog(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case, undoable)
 
     def _do_run(*_):
         remove_str = cmds.textFieldGrp(tf, q=True, text=True)
@@ -258,9 +305,11 @@ def _make_ui():
         apply_ns          = cmds.checkBox(cb_apply_ns, q=True, v=True)
         ignore_case       = cmds.checkBox(cb_ignore_case, q=True, v=True)
         want_preview      = cmds.checkBox(cb_preview, q=True, v=True)
+        undoable          = cmds.checkBox(cb_undoable, q=True, v=True)
         if want_preview:
-            _show_preview_dialog(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case); return
-        total, renamed, log = _bulk_remove(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case, dry_run=False)
+            _show_preview_dialog(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case, undoable); return
+        total, renamed, log = _bulk_remove(remove_str, include_shapes, include_connected, include_deformers, apply_ns, ignore_case,
+                                           dry_run=False, undoable=undoable)
         cmds.inViewMessage(amg=u"<hl>リネーム完了</hl>: 対象 {} / 変更 {} 件".format(total, renamed), pos="midCenter", fade=True, alpha=0.9)
         print(u"[結果] 対象: {} / 変更: {}".format(total, renamed)); [print(l) for l in log]
 
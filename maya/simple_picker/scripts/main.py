@@ -9,6 +9,7 @@ Controller Picker (Tabs + Instant Select + AlwaysOnTop)
 Maya: 2020+ / PySide2 前提
 """
 
+from collections import deque
 from typing import List, Set, Dict
 import re
 import os
@@ -26,6 +27,8 @@ except Exception:
     from shiboken6 import wrapInstance
 
 WINDOW_OBJECT_NAME = "ControllerPickerWindowV2"
+# 正規表現のメタ文字（含まれなければフィルタは単純な部分一致で済む）
+_REGEX_META = re.compile(r"[.^$*+?()\[\]{}|\\]")
 
 
 def _mqt_main_window():
@@ -38,33 +41,89 @@ def list_curve_ctrls_under(roots: List[str]) -> List[str]:
 
     発見順を安定させるため、親から子へBFSでトラバースする。
     ルートが未指定なら現在の選択順を採用する。
+    Maya への問い合わせはノード単位ではなくルート全体に対してまとめて行い、
+    BFS 自体は取得済みのパスから組み立てた子リストを Python 側でたどる。
     """
     if not roots:
         roots = cmds.ls(sl=True, long=True) or []
+    roots = cmds.ls(roots, long=True) or []  # 存在しないノードを除外
+    if not roots:
+        return []
+
+    # nurbsCurve シェイプを一括取得し、その親トランスフォームを求める
+    curves = cmds.listRelatives(roots, ad=True, type="nurbsCurve", f=True) or []
+    owners: Set[str] = set(cmds.listRelatives(curves, p=True, f=True) or []) if curves else set()
+    if not owners:
+        return []
+
+    # 子トランスフォームを一括取得し、親パス→子リストを組み立てる
+    # （-ad は深さ優先の逆順で返るので反転して兄弟順を Maya の順序に揃える）
+    descendants = cmds.listRelatives(roots, ad=True, type="transform", f=True) or []
+    children: Dict[str, List[str]] = {}
+    for n in reversed(descendants):
+        children.setdefault(n.rpartition("|")[0], []).append(n)
 
     result: List[str] = []
     seen: Set[str] = set()
 
     for r in roots:
-        if not cmds.objExists(r):
-            continue
-        queue = [r]
+        queue = deque([r])
         while queue:
-            node = queue.pop(0)
+            node = queue.popleft()
             # まず発見（親→子）順で自ノードを評価
-            shapes = cmds.listRelatives(node, s=True, f=True) or []
-            if shapes and any(cmds.nodeType(s) == "nurbsCurve" for s in shapes):
-                if node not in seen:
-                    seen.add(node)
-                    result.append(node)
+            if node in owners and node not in seen:
+                seen.add(node)
+                result.append(node)
             # 子のトランスフォームを、Mayaが返す順序のままキューへ追加
-            children = cmds.listRelatives(node, c=True, type="transform", f=True) or []
-            if children:
-                queue.extend(children)
+            queue.extend(children.get(node, ()))
 
     return result
 
 
+# ロングネーム→ショートネーム のキャッシュ（DAG の追加・削除・親子替え・名前変更と再スキャンで _clear_short_name_cache により破棄）
+_SHORT_NAME_CACHE: Dict[str, str] = {}
+
+
+def _clear_short_name_cache():
+    _SHORT_NAME_CACHE.clear()
+
+
+def _short_name_map(names: List[str]) -> Dict[str, str]:
+    """ロングネーム→ショートネーム 辞書を返す。
+    キャッシュに無い名前だけを一括で解決して追加する（存在しないノードは含まない）。
+    """
+    missing = [n for n in names if n not in _SHORT_NAME_CACHE]
+    if missing:
+        existing = cmds.ls(missing, long=True) or []
+        if existing:
+            _SHORT_NAME_CACHE.update(zip(existing, cmds.ls(existing, sn=True) or []))
+    return _SHORT_NAME_CACHE
+
+
+def _rows_for_names(names: Set[str], name_to_row: Dict[str, int]) -> List[int]:
+    """names のうち name_to_row に載っている行番号を返す（件数の少ない側を走査する）。"""
+    if len(names) <= len(name_to_row):
+        return [name_to_row[n] for n in names if n in name_to_row]
+    return [row for n, row in name_to_row.items() if n in names]
+
+
+def _populate_list_widget(lw: QtWidgets.QListWidget, names: List[str]):
+    """リストを names で作り直す。短縮名はまとめて解決し、挿入中は再描画とシグナルを止める。"""
+    shorts = _short_name_map(names)
+    lw.blockSignals(True)
+    lw.setUpdatesEnabled(False)
+    try:
+        lw.clear()
+        for n in names:
+            item = QtWidgets.QListWidgetItem(shorts.get(n, n))
+            item.setToolTip(n)
+            item.setData(QtCore.Qt.UserRole, n)
+            lw.addItem(item)
+    finally:
+        lw.setUpdatesEnabled(True)
+        lw.blockSignals(False)
+
+
 class PartsTab(QtWidgets.QWidget):
     """パーツ（タブ）1枚分のリストUI"""
     def __init__(self, title: str, parent=None):
@@ -72,23 +131,28 @@ class PartsTab(QtWidgets.QWidget):
         self.title = title
         self.list = QtWidgets.QListWidget(self)
         self.list.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self._names: List[str] = []
+        self._name_to_row: Dict[str, int] = {}
         lay = QtWidgets.QVBoxLayout(self)
         lay.addWidget(self.list)
 
     def set_items(self, names: List[str]):
-        self.list.clear()
-        for n in names:
-            short = cmds.ls(n, sn=True)[0] if cmds.objExists(n) else n
-            item = QtWidgets.QListWidgetItem(short)
-            item.setToolTip(n)
-            item.setData(QtCore.Qt.UserRole, n)
-            self.list.addItem(item)
+        _populate_list_widget(self.list, names)
+        self._names = list(names)
+        self._name_to_row = {n: i for i, n in enumerate(self._names)}
+
+    def select_names(self, names: Set[str]):
+        """names に含まれる行だけを 1 回の select で選択状態にする。"""
+        model = self.list.model()
+        selection = QtCore.QItemSelection()
+        for row in _rows_for_names(names, self._name_to_row):
+            idx = model.index(row, 0)
+            selection.select(idx, idx)
+        self.list.selectionModel().select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
 
     def items(self) -> List[str]:
-        out = []
-        for i in range(self.list.count()):
-            out.append(self.list.item(i).data(QtCore.Qt.UserRole))
-        return out
+        # set_items 時の名前リストを返す（ウィジェットを行ごとに走査しない）
+        return list(self._names)
 
 
 class ControllerPicker(QtWidgets.QDialog):
@@ -104,8 +168,17 @@ class ControllerPicker(QtWidgets.QDialog):
         # ----- 左：スキャン＆フィルタ -----
         self.search_edit = QtWidgets.QLineEdit(self)
         self.search_edit.setPlaceholderText("Filter (regex OK) 例: ^CTRL_|hair")
-        self.scan_list = QtWidgets.QListWidget(self)
+        # スキャン結果はモデル/ビュー構成にし、フィルタはプロキシで行を隠すだけにする
+        self.scan_list = QtWidgets.QListView(self)
         self.scan_list.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.scan_list.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self._scan_model = QtGui.QStandardItemModel(self)
+        self._scan_name_to_row: Dict[str, int] = {}
+        self._scan_proxy = QtCore.QSortFilterProxyModel(self)
+        self._scan_proxy.setSourceModel(self._scan_model)
+        self._scan_proxy.setFilterRole(QtCore.Qt.UserRole)  # ロングネームに対してフィルタ
+        self._scan_proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.scan_list.setModel(self._scan_proxy)
         self.refresh_btn = QtWidgets.QPushButton("Refresh from Selection", self)
         self.add_to_tab_btn = QtWidgets.QPushButton("➕ Add to Current Tab", self)
 
@@ -154,16 +227,28 @@ class ControllerPicker(QtWidgets.QDialog):
 
         # 状態
         self._all_scanned: List[str] = []
+        self._scan_signature = None  # 前回スキャン時の (ルート, シーン内カーブ) 署名
         self._updating_selection = False  # ループ防止
-        self._scriptjob_id = None
+        self._scriptjob_ids: List[int] = []
 
         # つなぎ込み
         self.refresh_btn.clicked.connect(self.refresh_from_scene)
-        self.search_edit.textChanged.connect(self._apply_filter)
+        # 入力が止まってからフィルタする（キー入力ごとのタイマー再始動でデバウンス）
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        # textChanged は文字列を渡すため、start(msec) に渡らないよう引数を捨てる
+        self.search_edit.textChanged.connect(lambda *_: self._filter_timer.start())
+        # SelectionChanged の連続発火（ドラッグ選択など）を 1 回の同期にまとめる
+        self._sync_timer = QtCore.QTimer(self)
+        self._sync_timer.setSingleShot(True)
+        self._sync_timer.setInterval(30)
+        self._sync_timer.timeout.connect(self._sync_ui_selection_with_scene)
         self.add_to_tab_btn.clicked.connect(self._add_selected_scan_to_current_tab)
 
         # 即時セレクト（左ペイン）
-        self.scan_list.itemSelectionChanged.connect(self._instant_select_from_scan)
+        self.scan_list.selectionModel().selectionChanged.connect(self._instant_select_from_scan)
         # 即時セレクト（右ペイン 各タブ）
         self.tabs.currentChanged.connect(self._hook_current_tab_signals)
 
@@ -175,52 +260,76 @@ class ControllerPicker(QtWidgets.QDialog):
         # 初期
         self.refresh_from_scene()
         self._install_selection_scriptjob()
+        self._install_dag_scriptjob()
         self._hook_current_tab_signals()  # 現在のタブのシグナルを接続
 
     # ---------------- Core ----------------
     def refresh_from_scene(self):
+        # 削除・親子替えを取りこぼしても、再スキャン時には必ずショートネームを解決し直す
+        _clear_short_name_cache()
         roots = cmds.ls(sl=True, long=True) or []
+        # カーブのロングネームは祖先パスを含むので、追加・削除・改名・親子替えで署名が変わる
+        sig = (tuple(roots), tuple(cmds.ls(type="nurbsCurve", long=True) or ()))
+        if sig == self._scan_signature:
+            return
+        self._scan_signature = sig
         self._all_scanned = list_curve_ctrls_under(roots)
         self._rebuild_scan_list(self._all_scanned)
 
     # ---------------- 左ペイン（スキャン結果） ----------------
     def _rebuild_scan_list(self, names: List[str]):
-        self.scan_list.clear()
-        for n in names:
-            short = cmds.ls(n, sn=True)[0] if cmds.objExists(n) else n
-            item = QtWidgets.QListWidgetItem(short)
-            item.setToolTip(n)
-            item.setData(QtCore.Qt.UserRole, n)
-            self.scan_list.addItem(item)
+        shorts = _short_name_map(names)
+        sm = self.scan_list.selectionModel()
+        sm.blockSignals(True)
+        try:
+            self._scan_model.clear()
+            self._scan_name_to_row = {n: i for i, n in enumerate(names)}
+            for n in names:
+                item = QtGui.QStandardItem(shorts.get(n, n))
+                item.setToolTip(n)
+                item.setData(n, QtCore.Qt.UserRole)
+                item.setEditable(False)
+                self._scan_model.appendRow(item)
+        finally:
+            sm.blockSignals(False)
 
     def _apply_filter(self):
         pat = self.search_edit.text().strip()
-        if not pat:
-            self._rebuild_scan_list(self._all_scanned)
+        if not _REGEX_META.search(pat):
+            # メタ文字が無ければ正規表現を組まずに部分一致で絞る
+            self._scan_proxy.setFilterFixedString(pat)
             return
-        try:
-            rx = re.compile(pat)
-            filtered = [n for n in self._all_scanned if rx.search(n)]
-        except re.error:
-            filtered = [n for n in self._all_scanned if pat in n]
-        self._rebuild_scan_list(filtered)
-
-    def _instant_select_from_scan(self):
+        rx = QtCore.QRegularExpression(pat, QtCore.QRegularExpression.CaseInsensitiveOption)
+        if rx.isValid():
+            self._scan_proxy.setFilterRegularExpression(rx)
+        else:
+            # 不正な正規表現は部分一致として扱う
+            self._scan_proxy.setFilterFixedString(pat)
+
+    def _scan_selected_names(self) -> List[str]:
+        """左ペインで選択中のノード（表示順）"""
+        idxs = sorted(self.scan_list.selectionModel().selectedIndexes(), key=lambda i: i.row())
+        return [i.data(QtCore.Qt.UserRole) for i in idxs]
+
+    def _instant_select_from_scan(self, *_):
         if self._updating_selection:
             return
-        names = [i.data(QtCore.Qt.UserRole) for i in self.scan_list.selectedItems()]
-        self._select_in_maya(names)
+        self._select_in_maya(self._scan_selected_names())
 
     def _add_selected_scan_to_current_tab(self):
         tab: PartsTab = self.tabs.currentWidget()
         if not isinstance(tab, PartsTab):
             return
-        picked = [i.data(QtCore.Qt.UserRole) for i in self.scan_list.selectedItems()]
+        picked = self._scan_selected_names()
         if not picked:
             return
-        current = tab.items()
-        # 重複回避
-        merged = current + [n for n in picked if n not in current]
+        merged = tab.items()
+        # 重複回避（set で O(N+M)）
+        seen = set(merged)
+        for n in picked:
+            if n not in seen:
+                seen.add(n)
+                merged.append(n)
         tab.set_items(merged)
 
     # ---------------- 右ペイン（タブ） ----------------
@@ -290,21 +399,29 @@ class ControllerPicker(QtWidgets.QDialog):
 
     def _deserialize_tabs(self, tabs_data):
         """辞書からUIを再構築（既存タブは破棄）"""
-        # 既存削除
-        while self.tabs.count() > 0:
-            w = self.tabs.widget(0)
-            self.tabs.removeTab(0)
-            w.deleteLater()
-        # 復元
-        for info in tabs_data:
-            title = info.get("title", "Untitled")
-            items = info.get("items", [])
-            tab = PartsTab(title, self)
-            tab.set_items(items)
-            self.tabs.addTab(tab, title)
-            tab.list.itemSelectionChanged.connect(self._instant_select_from_tab)
-        self._ensure_default_tab()
-        self.tabs.setCurrentIndex(0)
+        # 作り直しの間はタブの currentChanged と再描画を止める
+        # （各タブの即時セレクトはここで直接つなぐので currentChanged のフックは不要）
+        self.tabs.blockSignals(True)
+        self.tabs.setUpdatesEnabled(False)
+        try:
+            # 既存削除（clear はウィジェットを破棄しないので deleteLater する）
+            old_tabs = [self.tabs.widget(i) for i in range(self.tabs.count())]
+            self.tabs.clear()
+            for w in old_tabs:
+                w.deleteLater()
+            # 復元
+            for info in tabs_data:
+                title = info.get("title", "Untitled")
+                items = info.get("items", [])
+                tab = PartsTab(title, self)
+                tab.set_items(items)
+                self.tabs.addTab(tab, title)
+                tab.list.itemSelectionChanged.connect(self._instant_select_from_tab)
+            self._ensure_default_tab()
+            self.tabs.setCurrentIndex(0)
+        finally:
+            self.tabs.setUpdatesEnabled(True)
+            self.tabs.blockSignals(False)
 
     def _scripts_dir(self) -> Path:
         """main.py（このファイル）と同じディレクトリを返す"""
@@ -372,32 +489,48 @@ class ControllerPicker(QtWidgets.QDialog):
     def _install_selection_scriptjob(self):
         def on_sel_changed():
             # シーン選択 → UI反映（控えめに、現在タブだけ追随）
-            self._sync_ui_selection_with_scene()
+            self._sync_timer.start()
         self._remove_scriptjob()
-        self._scriptjob_id = cmds.scriptJob(e=["SelectionChanged", on_sel_changed], protected=True)
+        self._scriptjob_ids.append(
+            cmds.scriptJob(e=["SelectionChanged", on_sel_changed], protected=True)
+        )
+
+    def _install_dag_scriptjob(self):
+        # 同名ノードの追加・削除・親子替え・名前変更・シーン切替でショートネームが変わりうるのでキャッシュを捨てる
+        # （Maya のバージョンによって無いイベントは listEvents で確認して飛ばす）
+        available = set(cmds.scriptJob(listEvents=True) or [])
+        for ev in ("DagObjectCreated", "DagObjectDeleted", "parentChanged", "NameChanged",
+                   "SceneOpened", "NewSceneOpened"):
+            if ev not in available:
+                continue
+            self._scriptjob_ids.append(
+                cmds.scriptJob(e=[ev, _clear_short_name_cache], protected=True)
+            )
 
     def _remove_scriptjob(self):
-        if self._scriptjob_id and cmds.scriptJob(exists=self._scriptjob_id):
-            try:
-                cmds.scriptJob(kill=self._scriptjob_id, force=True)
-            except Exception:
-                pass
-        self._scriptjob_id = None
+        for job in self._scriptjob_ids:
+            if cmds.scriptJob(exists=job):
+                try:
+                    cmds.scriptJob(kill=job, force=True)
+                except Exception:
+                    pass
+        self._scriptjob_ids = []
 
     def _sync_ui_selection_with_scene(self):
         sel = set(cmds.ls(sl=True, long=True) or [])
         self._updating_selection = True
         try:
-            # 左リスト
-            for i in range(self.scan_list.count()):
-                it = self.scan_list.item(i)
-                it.setSelected(it.data(QtCore.Qt.UserRole) in sel)
+            # 左リスト（名前→行の辞書から表示中の行だけをまとめて選択）
+            selection = QtCore.QItemSelection()
+            for row in _rows_for_names(sel, self._scan_name_to_row):
+                idx = self._scan_proxy.mapFromSource(self._scan_model.index(row, 0))
+                if idx.isValid():
+                    selection.select(idx, idx)
+            self.scan_list.selectionModel().select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
             # 右カレントタブ
             tab: PartsTab = self.tabs.currentWidget()
             if isinstance(tab, PartsTab):
-                for i in range(tab.list.count()):
-                    it = tab.list.item(i)
-                    it.setSelected(it.data(QtCore.Qt.UserRole) in sel)
+                tab.select_names(sel)
         finally:
             self._updating_selection = False
 
@@ -410,8 +543,7 @@ class ControllerPicker(QtWidgets.QDialog):
         except Exception as e:
             cmds.warning(f"[ControllerPicker] Select failed: {e}")
         finally:
-            # 少し遅延してUI同期（クリック直後のちらつき防止）
-            QtCore.QTimer.singleShot(0, self._sync_ui_selection_with_scene)
+            # UI同期は cmds.select が発火する SelectionChanged（デバウンス済み）に任せる
             self._updating_selection = False
 
     def closeEvent(self, ev):